@@ -1,53 +1,111 @@
 import argparse
+import hashlib
+import json
+import math
 import os
+import shlex
 import subprocess
-from datetime import datetime, timedelta, timezone
-
-import gpxpy
-from geopy.distance import geodesic
-
-
-def get_video_info(video_file, ffmpeg_path='ffmpeg', debug_mode=False):
-    import subprocess
-
-    # Get width, height, frame rate
-    cmd_stream = [
+import sys
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from lxml import etree
+
+EARTH_RADIUS_M = 6371000.0
+
+GPX_CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'speed_overlay'
+# Older entries beyond this many are evicted, so edited GPX files don't pile up
+GPX_CACHE_MAX_ENTRIES = 32
+# Part of the cache key; bump whenever load_gpx output changes so stale entries are ignored
+GPX_CACHE_VERSION = 1
+
+# Video encoder arguments per --hwaccel choice; 'none' is the software fallback
+ENCODER_ARGS = {
+    # -b:v 0 lifts nvenc's default 2 Mb/s cap so -cq alone sets the quality
+    'nvenc': ['-c:v', 'h264_nvenc', '-preset', 'p4', '-cq', '19', '-b:v', '0'],
+    'qsv': ['-c:v', 'h264_qsv', '-preset', 'veryfast', '-global_quality', '19'],
+    # VideoToolbox -q:v runs 1-100 (higher is better); ~75 is roughly x264 CRF 18, 65 is closer to CRF 23
+    'vt': ['-c:v', 'h264_videotoolbox', '-q:v', '75'],
+    'none': ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '18'],
+}
+
+
+def start_video_probe(video_file, ffmpeg_path='ffmpeg', debug_mode=False):
+    # Launch ffprobe for width, height, frame rate and duration without waiting on it
+    cmd = [
         ffmpeg_path.replace('ffmpeg', 'ffprobe'),
         '-v', 'error',
         '-select_streams', 'v:0',
-        '-show_entries', 'stream=width,height,r_frame_rate',
-        '-of', 'csv=p=0',
+        '-show_entries', 'stream=width,height,r_frame_rate:format=duration',
+        '-of', 'json',
         video_file
     ]
-    stream_info = subprocess.check_output(cmd_stream, universal_newlines=True).strip()
-    width, height, fps_raw = stream_info.split(',')
+    debug_print(f"Running FFprobe: {' '.join(cmd)}", debug_mode)
+    return subprocess.Popen(cmd, stdout=subprocess.PIPE, universal_newlines=True)
 
-    # Parse frame rate (e.g. '30000/1001')
-    num, denom = map(int, fps_raw.split('/'))
-    fps = num / denom
 
-    # Get duration
-    cmd_duration = [
-        ffmpeg_path.replace('ffmpeg', 'ffprobe'),
-        '-v', 'error',
-        '-show_entries', 'format=duration',
-        '-of', 'default=noprint_wrappers=1:nokey=1',
-        video_file
-    ]
-    duration = float(subprocess.check_output(cmd_duration, universal_newlines=True).strip())
+def read_video_info(probe):
+    output, _ = probe.communicate()
+    if probe.returncode:
+        raise subprocess.CalledProcessError(probe.returncode, probe.args, output)
+    info = json.loads(output)
+    stream = info['streams'][0]
+
+    # Parse frame rate (e.g. '30000/1001')
+    num, denom = map(int, stream['r_frame_rate'].split('/'))
 
     return {
-        'width': int(width),
-        'height': int(height),
-        'fps': fps,
-        'duration': duration
+        'width': int(stream['width']),
+        'height': int(stream['height']),
+        'fps': num / denom,
+        'duration': float(info['format']['duration'])
     }
 
 
-def parse_arguments():
+@lru_cache(maxsize=None)
+def get_hw_encoders(ffmpeg_path='ffmpeg'):
+    # Hardware encoders from ENCODER_ARGS that can actually encode here, in preference order.
+    # Distro builds list nvenc/qsv even without a GPU, so each candidate gets a one-frame test encode.
+    try:
+        output = subprocess.check_output([ffmpeg_path, '-hide_banner', '-encoders'],
+                                         stderr=subprocess.DEVNULL, universal_newlines=True)
+    except (OSError, subprocess.CalledProcessError):
+        return []
+    names = {fields[1] for fields in map(str.split, output.splitlines()) if len(fields) > 1}
+    available = []
+    for key, enc_args in ENCODER_ARGS.items():
+        if key == 'none' or enc_args[1] not in names:
+            continue
+        # 256x256 stays above the minimum frame size of older NVENC generations
+        cmd = [ffmpeg_path, '-hide_banner', '-nostdin', '-f', 'lavfi', '-i', 'color=s=256x256',
+               '-frames:v', '1', *enc_args, '-f', 'null', '-']
+        try:
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError:
+            continue
+        if result.returncode == 0:
+            available.append(key)
+    return available
+
+
+def resolve_encoder(args):
+    # Turn --hwaccel auto into a concrete ENCODER_ARGS key
+    if args.hwaccel != 'auto':
+        return args.hwaccel
+    available = get_hw_encoders(args.ffmpeg_path)
+    debug_print(f"Working hardware encoders: {available}", args.debug)
+    return available[0] if available else 'none'
+
+
+def build_parser():
     parser = argparse.ArgumentParser(description='Add speed overlay to video based on GPX data')
-    parser.add_argument('video_file', help='Path to the MP4 video file')
-    parser.add_argument('gpx_file', help='Path to the GPX file')
+    parser.add_argument('video_file', nargs='?', help='Path to the MP4 video file')
+    parser.add_argument('gpx_file', nargs='?', help='Path to the GPX file')
     parser.add_argument('--output', '-o', default=None, help='Output video file path')
     parser.add_argument('--time_delta', '-t', default=0, type=int,
                         help='Time delta in seconds to apply to video timestamps (can be negative)')
@@ -60,9 +118,17 @@ def parse_arguments():
     parser.add_argument('--units', '-u', default='km/h', choices=['km/h', 'mph'], help='Speed units to display')
     parser.add_argument('--min_points', '-m', default=2, type=int,
                         help='Minimum points needed in the range to compute speed')
+    parser.add_argument('--hwaccel', default='auto', choices=['auto', *ENCODER_ARGS],
+                        help='Video encoder: auto-detect a hardware encoder, force one, or none for libx264')
+    parser.add_argument('--no_cache', action='store_true',
+                        help='Always parse the GPX file instead of using the parsed-track cache')
     parser.add_argument('--ffmpeg_path', default='ffmpeg', help='Path to ffmpeg executable if not in system PATH')
+    parser.add_argument('--manifest', default=None,
+                        help='Batch mode: TSV file with one video<TAB>gpx[<TAB>options] job per line')
+    parser.add_argument('--parallel', default=None, type=int,
+                        help='Number of videos to encode at once in batch mode (default: half the CPU cores)')
     parser.add_argument('--debug', '-d', action='store_true', help='Enable debug mode with additional output')
-    return parser.parse_args()
+    return parser
 
 
 def debug_print(msg, debug):
@@ -71,52 +137,125 @@ def debug_print(msg, debug):
 
 
 def load_gpx(gpx_file):
-    with open(gpx_file, 'r') as f:
-        gpx = gpxpy.parse(f)
-    points = []
-    for track in gpx.tracks:
-        for segment in track.segments:
-            for point in segment.points:
-                points.append({'time': point.time, 'lat': point.latitude, 'lon': point.longitude})
-    points.sort(key=lambda p: p['time'])
+    lats, lons, ts = [], [], []
+    # Stream trackpoints and free each one once read, so memory stays flat on long tracks
+    for _, elem in etree.iterparse(gpx_file, tag='{*}trkpt'):
+        time_text = elem.findtext('{*}time')
+        if time_text:
+            lats.append(float(elem.get('lat')))
+            lons.append(float(elem.get('lon')))
+            time = datetime.fromisoformat(time_text.strip())
+            if time.tzinfo is None:
+                time = time.replace(tzinfo=timezone.utc)  # GPX times are UTC
+            ts.append(time.timestamp())
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+    t = np.array(ts, dtype=np.float64)
+    order = np.argsort(t, kind='stable')
+    # Struct-of-arrays: radians for the distance kernel, epoch seconds for windowing
+    return {
+        'lat': np.deg2rad(np.array(lats, dtype=np.float64)[order]),
+        'lon': np.deg2rad(np.array(lons, dtype=np.float64)[order]),
+        't': t[order],
+    }
+
+
+def load_gpx_cached(gpx_file, debug=False):
+    # Parsed arrays are cached by file content, so re-runs on the same GPX skip parsing
+    digest = hashlib.sha1()
+    with open(gpx_file, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    cache_path = GPX_CACHE_DIR / f"v{GPX_CACHE_VERSION}-{digest.hexdigest()}.npz"
+    try:
+        with np.load(cache_path) as cached:
+            points = {key: cached[key] for key in ('lat', 'lon', 't')}
+    except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile):
+        pass
+    else:
+        debug_print(f"Using cached GPX data from {cache_path}", debug)
+        try:
+            os.utime(cache_path)
+        except OSError:
+            pass
+        return points
+
+    points = load_gpx(gpx_file)
+    # Write then rename, so a concurrent run never reads a half-written cache file
+    tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp.npz")
+    try:
+        GPX_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(tmp_path, **points)
+        os.replace(tmp_path, cache_path)
+        prune_gpx_cache()
+    except OSError as e:
+        debug_print(f"Could not write GPX cache: {e}", debug)
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
     return points
 
 
-def get_speed(points, target_time, time_window=10, min_points=2):
-    nearby = [p for p in points if abs((p['time'] - target_time).total_seconds()) <= time_window]
-    if len(nearby) < min_points:
-        return None
-    distances = []
-    times = []
-    for i in range(len(nearby) - 1):
-        d = geodesic((nearby[i]['lat'], nearby[i]['lon']), (nearby[i + 1]['lat'], nearby[i + 1]['lon'])).meters
-        t = (nearby[i + 1]['time'] - nearby[i]['time']).total_seconds()
-        distances.append(d)
-        times.append(t)
-    total_distance = sum(distances)
-    total_time = sum(times)
-    if total_time == 0:
-        return None
-    return (total_distance / total_time) * 3.6  # m/s to km/h
-
-
-def convert_speed(speed, units):
-    if speed is None:
-        return None
-    if units == 'mph':
-        return speed * 0.621371
-    return speed
-
-
-def format_ass_timestamp(seconds):
-    h = int(seconds // 3600)
-    m = int((seconds % 3600) // 60)
-    s = int(seconds % 60)
-    cs = int((seconds % 1) * 100)
-    return f"{h}:{m:02}:{s:02}.{cs:02}"
-
-
-def generate_ass(points, start_time, fps, duration, video_info, args):
+def prune_gpx_cache():
+    # Keep the most recently used entries; cache hits refresh the mtime
+    entries = []
+    for path in GPX_CACHE_DIR.glob('v*-*.npz'):
+        if path.name.endswith('.tmp.npz'):
+            continue
+        try:
+            entries.append((path.stat().st_mtime, path))
+        except OSError:
+            pass  # Removed by a concurrent run
+    for _, path in sorted(entries, reverse=True)[GPX_CACHE_MAX_ENTRIES:]:
+        path.unlink(missing_ok=True)
+
+
+def great_circle_pairs(lat, lon):
+    # Distance in meters between consecutive points, lat/lon in radians.
+    # Vincenty's spherical atan2 form stays accurate for both tiny and near-antipodal steps,
+    # where haversine's asin(sqrt(a)) loses precision.
+    sin_lat = np.sin(lat)
+    cos_lat = np.cos(lat)
+    dlam = np.diff(lon)
+    cos_dlam = np.cos(dlam)
+    e = cos_lat[1:] * np.sin(dlam)
+    f = cos_lat[:-1] * sin_lat[1:] - sin_lat[:-1] * cos_lat[1:] * cos_dlam
+    g = sin_lat[:-1] * sin_lat[1:] + cos_lat[:-1] * cos_lat[1:] * cos_dlam
+    return EARTH_RADIUS_M * np.arctan2(np.sqrt(e * e + f * f), g)
+
+
+def compute_speeds(points, frame_times, scale=3.6, time_window=10, min_points=2):
+    # Boxcar average over +/- time_window of the piecewise-constant segment speeds (NaN where unknown),
+    # multiplied by scale to convert from m/s. Distance along the track is linear between points, so the
+    # average is a difference of interpolated cumulative distances divided by the part of the window the
+    # track covers.
+    t = points['t']
+    speeds = np.full(len(frame_times), np.nan)
+    if len(t) < 2:
+        return speeds
+    cum_d = np.concatenate([[0.0], np.cumsum(great_circle_pairs(points['lat'], points['lon']))])
+    start = np.maximum(frame_times - time_window, t[0])
+    end = np.minimum(frame_times + time_window, t[-1])
+
+    lo = np.searchsorted(t, frame_times - time_window, side='left')
+    hi = np.searchsorted(t, frame_times + time_window, side='right')
+    valid = (hi - lo >= max(min_points, 2)) & (end > start)
+    dist = np.interp(end[valid], t, cum_d) - np.interp(start[valid], t, cum_d)
+    speeds[valid] = dist / (end[valid] - start[valid]) * scale
+    return speeds
+
+
+def format_ass_timestamps(seconds):
+    # ASS H:MM:SS.cc timestamps for an array of seconds, split into fields with integer math
+    s, cs = np.divmod(np.floor(np.asarray(seconds) * 100).astype(np.int64), 100)
+    m, s = np.divmod(s, 60)
+    h, m = np.divmod(m, 60)
+    return [f"{h}:{m:02}:{s:02}.{cs:02}" for h, m, s, cs in zip(h.tolist(), m.tolist(), s.tolist(), cs.tolist())]
+
+
+def generate_ass_to_file(fh, points, start_ts, fps, duration, video_info, args):
     align_map = {
         'top_left': 7,
         'top_right': 9,
@@ -138,110 +277,163 @@ Style: Default,Arial,{int(48 * args.font_scale)},&H00FFFFFF,&H000000FF,&H0000000
 [Events]
 Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
 """
-    events = []
-    interval = 1 / fps
-    current = start_time
-    frame = 0
-    while frame * interval < duration:
-        speed = get_speed(points, current, min_points=args.min_points)
-        speed = convert_speed(speed, args.units)
-        if speed is not None:
-            text = f"Speed: {speed:.1f} {args.units}"
-        else:
-            text = "Speed: N/A"
-
-        start = format_ass_timestamp((current - start_time).total_seconds())
-        end = format_ass_timestamp((current - start_time + timedelta(seconds=interval)).total_seconds())
-
-        events.append(f"Dialogue: 0,{start},{end},Default,,0,0,0,,{text}")
-
-        frame += 1
-        current += timedelta(seconds=interval)
-
-    return header + "\n".join(events)
-
-
-def get_video_duration(video_file, ffmpeg_path):
+    frames = np.arange(math.ceil(duration * fps))
+    scale = 3.6 * (0.621371 if args.units == 'mph' else 1.0)  # m/s to km/h or mph
+    speeds = compute_speeds(points, start_ts + frames / fps, scale, min_points=args.min_points)
+    speeds = np.round(speeds, 1)
+
+    # One event per run of frames showing the same value (NaN runs included)
+    new_run = np.ones(len(frames), dtype=bool)
+    new_run[1:] = (speeds[1:] != speeds[:-1]) & ~(np.isnan(speeds[1:]) & np.isnan(speeds[:-1]))
+    starts = np.flatnonzero(new_run)
+    texts = ["Speed: N/A" if math.isnan(speed) else f"Speed: {speed:.1f} {args.units}"
+             for speed in speeds[starts].tolist()]
+
+    # Run i spans boundaries i..i+1, so format each boundary once
+    stamps = format_ass_timestamps(np.append(starts, len(frames)) / fps)
+
+    fh.write(header)
+    for start, end, text in zip(stamps[:-1], stamps[1:], texts):
+        fh.write(f"Dialogue: 0,{start},{end},Default,,0,0,0,,{text}")
+        fh.write("\n")
+
+
+def process_video(args, threads=None, quiet=False):
+    # ffprobe and GPX parsing are independent, so parse while ffprobe runs
+    debug_print("Getting video properties and parsing GPX...", args.debug)
+    probe = start_video_probe(args.video_file, args.ffmpeg_path, args.debug)
     try:
-        cmd = [ffmpeg_path.replace('ffmpeg', 'ffprobe'), '-v', 'error', '-show_entries', 'format=duration', '-of',
-               'default=noprint_wrappers=1:nokey=1', video_file]
-        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True,
-                                check=True)
-        return float(result.stdout.strip())
-    except Exception as e:
-        print(f"ERROR: Could not get video duration: {e}")
-        return None
-
-
-def get_video_fps(video_file, ffmpeg_path):
-    try:
-        cmd = [ffmpeg_path.replace('ffmpeg', 'ffprobe'), '-v', 'error', '-select_streams', 'v:0', '-show_entries',
-               'stream=r_frame_rate', '-of', 'csv=p=0', video_file]
-        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True,
-                                check=True)
-        num, denom = map(int, result.stdout.strip().split('/'))
-        return num / denom
-    except Exception as e:
-        print(f"ERROR: Could not get video fps: {e}")
-        return 30.0  # Default to 30 FPS
-
-
-def main():
-    args = parse_arguments()
-    video_info = get_video_info(args.video_file, args.ffmpeg_path, args.debug)
-    debug_print("Parsing GPX...", args.debug)
-    gpx_points = load_gpx(args.gpx_file)
-
-    debug_print("Getting video properties...", args.debug)
-    duration = get_video_duration(args.video_file, args.ffmpeg_path)
-    fps = get_video_fps(args.video_file, args.ffmpeg_path)
+        if args.no_cache:
+            gpx_points = load_gpx(args.gpx_file)
+        else:
+            gpx_points = load_gpx_cached(args.gpx_file, args.debug)
+    except BaseException:
+        probe.kill()
+        probe.wait()
+        raise
+    video_info = read_video_info(probe)
+    duration = video_info['duration']
+    fps = video_info['fps']
 
     if args.video_date:
-        video_start_time = datetime.fromisoformat(args.video_date.rstrip('Z')).replace(tzinfo=timezone.utc)
+        video_start_ts = datetime.fromisoformat(args.video_date.rstrip('Z')).replace(tzinfo=timezone.utc).timestamp()
     else:
-        video_start_time = gpx_points[0]['time'].astimezone(timezone.utc)
-    video_start_time += timedelta(seconds=args.time_delta)
+        video_start_ts = float(gpx_points['t'][0])
+    video_start_ts += args.time_delta
 
-    debug_print(f"Start time: {video_start_time.isoformat()}", args.debug)
+    debug_print(f"Start time: {datetime.fromtimestamp(video_start_ts, tz=timezone.utc).isoformat()}", args.debug)
     debug_print(f"Duration: {duration:.2f} seconds", args.debug)
     debug_print(f"FPS: {fps:.2f}", args.debug)
 
-    ass_path = os.path.abspath("overlay.ass")  # Write overlay.ass in your working directory
-
-    debug_print(f"Generating ASS overlay at {ass_path}", args.debug)
+    # Private temp file per run, so concurrent runs don't clobber each other's overlay
+    tmp = tempfile.NamedTemporaryFile('w', suffix='.ass', delete=False, encoding='utf-8')
+    tmp.close()
+    ass_path = tmp.name
+    try:
+        debug_print(f"Generating ASS overlay at {ass_path}", args.debug)
 
-    ass_content = generate_ass(gpx_points, video_start_time, fps, duration, video_info, args)
+        with open(ass_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            generate_ass_to_file(f, gpx_points, video_start_ts, fps, duration, video_info, args)
 
-    with open(ass_path, 'w', encoding='utf-8') as f:
-        f.write(ass_content)
+        output_file = encode_video(args, ass_path, threads, quiet)
+    finally:
+        # Not atexit: pool workers exit without running atexit handlers
+        os.unlink(ass_path)
 
-        debug_print(f"Generating ASS overlay at {ass_path}", args.debug)
+    print(f"✅ Done! Output saved to: {output_file}")
+    return output_file
+
+
+def encode_video(args, ass_path, threads=None, quiet=False):
+    output_file = args.output
+    if not output_file:
+        base, ext = os.path.splitext(args.video_file)
+        output_file = f"{base}_with_speed{ext}"
+
+    debug_print(f"Output file will be: {output_file}", args.debug)
+
+    encoder = resolve_encoder(args)
+
+    safe_ass_path = ass_path.replace('\\', '/')
+    cmd = [
+        args.ffmpeg_path,
+        '-nostdin',
+        *(['-nostats', '-loglevel', 'error'] if quiet else []),
+        '-i', args.video_file,
+        '-vf', f"ass={safe_ass_path}",
+        *ENCODER_ARGS[encoder],
+        '-c:a', 'copy',
+        *(['-threads', str(threads)] if threads else []),
+        '-y',
+        output_file
+    ]
+    debug_print(f"Running FFmpeg: {' '.join(cmd)}", args.debug)
+
+    # Run FFmpeg
+    subprocess.run(cmd, check=True)
+
+    return output_file
+
+
+def read_manifest(parser, args):
+    # One job per line: video<TAB>gpx[<TAB>options], options overriding the command line ones
+    base_dir = os.path.dirname(args.manifest)
+    jobs = []
+    with open(args.manifest, 'r', encoding='utf-8') as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip() or line.startswith('#'):
+                continue
+            fields = line.rstrip('\r\n').split('\t')
+            if len(fields) < 2:
+                parser.error(f"{args.manifest}:{lineno}: expected video<TAB>gpx[<TAB>options]")
+            job = argparse.Namespace(**vars(args))
+            opts = shlex.split(fields[2]) if len(fields) > 2 else []
+            job = parser.parse_args([fields[0], fields[1], *opts], namespace=job)
+            # Relative paths in the manifest are relative to the manifest itself
+            job.video_file = os.path.join(base_dir, job.video_file)
+            job.gpx_file = os.path.join(base_dir, job.gpx_file)
+            if job.output:
+                job.output = os.path.join(base_dir, job.output)
+            jobs.append(job)
+    return jobs
+
+
+def run_batch(parser, args):
+    jobs = read_manifest(parser, args)
+    # Probe hardware encoders once here rather than in every worker
+    for job in jobs:
+        job.hwaccel = resolve_encoder(job)
+    cpus = os.cpu_count() or 1
+    workers = args.parallel if args.parallel is not None else max(cpus // 2, 1)
+    threads = max(cpus // workers, 1)
+    debug_print(f"Running {len(jobs)} jobs on {workers} workers, {threads} ffmpeg threads each", args.debug)
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        futures = {ex.submit(process_video, job, threads, True): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                failed += 1
+                print(f"ERROR: {futures[future].video_file} failed: {e}")
+    if failed:
+        sys.exit(f"{failed} of {len(jobs)} videos failed")
 
-        output_file = args.output
-        if not output_file:
-            base, ext = os.path.splitext(args.video_file)
-            output_file = f"{base}_with_speed{ext}"
-
-        debug_print(f"Output file will be: {output_file}", args.debug)
-
-        safe_ass_path = ass_path.replace('\\', '/')
-        cmd = [
-            args.ffmpeg_path,
-            '-i', args.video_file,
-            '-vf', f"ass={safe_ass_path}",
-            '-c:v', 'libx264',
-            '-crf', '18',
-            '-preset', 'medium',
-            '-c:a', 'copy',
-            '-y',
-            output_file
-        ]
-        debug_print(f"Running FFmpeg: {' '.join(cmd)}", args.debug)
-
-        # Run FFmpeg
-        subprocess.run(cmd, check=True)
 
-    print(f"✅ Done! Output saved to: {output_file}")
+def main():
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.parallel is not None and args.parallel < 1:
+        parser.error('--parallel must be at least 1')
+    if args.manifest and args.output:
+        parser.error('--output applies to a single video; set -o per job in the manifest instead')
+    if args.manifest:
+        run_batch(parser, args)
+    elif args.video_file and args.gpx_file:
+        process_video(args)
+    else:
+        parser.error('video_file and gpx_file are required unless --manifest is given')
 
 
 if __name__ == "__main__":